@@ -11,15 +11,23 @@ import os
 import sys
 import csv
 import time
-import requests
+import random
+import math
 from datetime import datetime
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+from cloudinary.exceptions import Error, RateLimited, GeneralError
 from urllib.parse import urlparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import threading
-import json
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import itertools
+import glob
+import shutil
+import orjson
 
 # ============================================
 # CONFIGURATION
@@ -39,48 +47,69 @@ DEST_CONFIG = {
     'api_secret': os.environ.get('DEST_CLOUDINARY_API_SECRET')
 }
 
+# NOTE: Account credentials are passed to every SDK call (**SOURCE_CONFIG /
+# **DEST_CONFIG) instead of switching the process-global cloudinary.config(),
+# so parallel workers can never see the other account's config mid-request
+
 MIGRATION_LOG = "migration_log.csv"
 CLOUDINARY_BASE = "manga"
 PARALLEL_WORKERS = 10  # Number of simultaneous uploads
-RESOURCE_CACHE = "resource_cache.json"  # Cache fetched resources
-
-# Thread-safe lock for logging
-log_lock = threading.Lock()
+RESOURCE_CACHE = "resource_cache.jsonl"  # Cache fetched resources (one JSON object per line)
+RESOURCE_CACHE_META = "resource_cache.meta.json"  # Listing state, for resuming a partial cache
+PROGRESS_EVERY = 10  # Print every Nth completed image (failures are always printed)
+LISTING_WORKERS = 4  # Parallel resource listings (kept small - Admin API is 500/hour)
+FOLDER_SHARD = "folder:"  # Listing shard of the assets directly in a folder (not its subfolders)
 
-# ============================================
-# DUAL CLOUDINARY CLIENT
-# ============================================
+# Each thread appends to its own log shard (migration_log.<pid>.<n>.csv) with
+# no locking, flushing every row so a killed run loses nothing; shards are
+# merged into MIGRATION_LOG at the end of a run, or by the next run
+_log_local = threading.local()
+_log_shards = []
+_log_shard_ids = itertools.count()
+_now = datetime.now
 
-class CloudinaryClient:
-    """Wrapper to switch between source and destination accounts"""
-    
-    @staticmethod
-    def configure_source():
-        cloudinary.config(**SOURCE_CONFIG)
-    
-    @staticmethod
-    def configure_dest():
-        cloudinary.config(**DEST_CONFIG)
+# Progress output of the migration loop (see start_progress_logging)
+progress_log = logging.getLogger('migration.progress')
+progress_log.setLevel(logging.INFO)
+progress_log.propagate = False
 
+# Serializes appends to RESOURCE_CACHE and RESOURCE_CACHE_META from listing workers
+_cache_lock = threading.Lock()
 
 # ============================================
 # MIGRATION LOG MANAGEMENT
 # ============================================
 
+def resource_key(resource):
+    """
+    Canonical key for a resource: its full public_id
+    (manga/slug/chapter-001/panel-001), also logged as source_path
+    """
+    return resource['public_id']
+
+
 def load_migration_log():
     """Load already migrated images from log"""
     migrated = set()
     
+    # Fold in shards left behind by an interrupted run
+    merge_log_shards()
+    
     if not os.path.exists(MIGRATION_LOG):
         return migrated
     
     try:
-        with open(MIGRATION_LOG, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row['status'] == 'success':
-                    # Store full path: manga/slug/chapter-001/panel-001
-                    migrated.add(row['source_path'])
+        with open(MIGRATION_LOG, 'r', encoding='utf-8', buffering=1 << 20) as f:
+            next(f, None)  # Skip header
+            
+            # Row layout: timestamp,source_path,dest_path,status,error
+            # The ',success,' substring check skips other rows without splitting
+            # Store full path: manga/slug/chapter-001/panel-001
+            migrated = {
+                parts[1]
+                for parts in (line.split(',', 4) for line in f if ',success,' in line)
+                if parts[3] == 'success'
+            }
     except Exception as e:
         print(f"⚠️  Could not load migration log: {e}")
     
@@ -88,136 +117,385 @@ def load_migration_log():
 
 
 def log_migration(source_path, dest_path, status, error=''):
-    """Log migration result (thread-safe)"""
-    
-    with log_lock:
-        # Create log file if doesn't exist
-        if not os.path.exists(MIGRATION_LOG):
-            with open(MIGRATION_LOG, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp', 'source_path', 'dest_path', 
-                    'status', 'error'
-                ])
-        
-        # Append result
-        with open(MIGRATION_LOG, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().isoformat(),
-                source_path,
-                dest_path,
-                status,
-                error
+    """Log migration result to the calling thread's shard (no locking)"""
+    
+    log = getattr(_log_local, 'log', None)
+    if log is None:
+        log = _open_log_shard()
+    
+    log['writer'].writerow([
+        _now().isoformat(),
+        source_path,
+        dest_path,
+        status,
+        error
+    ])
+    log['file'].flush()
+
+
+def _log_shard_paths():
+    """Log shard files written by this or earlier runs"""
+    base, ext = os.path.splitext(MIGRATION_LOG)
+    return sorted(glob.glob(f"{base}.*{ext}"))
+
+
+def _open_log_shard():
+    """Open a new log shard for the calling thread"""
+    
+    base, ext = os.path.splitext(MIGRATION_LOG)
+    path = f"{base}.{os.getpid()}.{next(_log_shard_ids)}{ext}"
+    
+    f = open(path, 'w', newline='', encoding='utf-8')
+    _log_shards.append(f)
+    
+    _log_local.log = {'file': f, 'writer': csv.writer(f)}
+    return _log_local.log
+
+
+def merge_log_shards():
+    """
+    Close open log shards and append all shards to MIGRATION_LOG
+    Shards have no header row
+    """
+    global _log_local
+    
+    while _log_shards:
+        _log_shards.pop().close()
+    _log_local = threading.local()
+    
+    shard_paths = _log_shard_paths()
+    if not shard_paths:
+        return
+    
+    is_new = not os.path.exists(MIGRATION_LOG)
+    
+    with open(MIGRATION_LOG, 'a', newline='', encoding='utf-8') as out:
+        # Create header if log doesn't exist
+        if is_new:
+            csv.writer(out).writerow([
+                'timestamp', 'source_path', 'dest_path', 
+                'status', 'error'
             ])
+        
+        for path in shard_paths:
+            with open(path, 'r', newline='', encoding='utf-8') as shard:
+                shutil.copyfileobj(shard, out)
+    
+    for path in shard_paths:
+        os.remove(path)
 
 
 # ============================================
 # CLOUDINARY RESOURCE FETCHING WITH CACHE
 # ============================================
 
-def get_all_resources_from_source(folder_prefix):
+def with_backoff(fn, max_retries=6, base=1.0, cap=60.0, stop=None, log=print):
     """
-    Get all resources from source Cloudinary under a folder prefix
-    Returns list of resources with their metadata
-    USES CACHING to avoid re-fetching on rate limit errors
+    Call fn(), retrying rate-limit (420/429), server and transport errors
+    with exponential backoff and jitter
+    Re-raises the last error once max_retries is exhausted, or as soon
+    as the optional stop event is set
+    Retry messages go to log (progress_log.info inside the migration loop)
     """
     
-    # Check cache first
-    if os.path.exists(RESOURCE_CACHE):
-        print(f"📦 Found cached resource list: {RESOURCE_CACHE}")
+    for attempt in range(max_retries + 1):
         try:
-            with open(RESOURCE_CACHE, 'r') as f:
-                cached_data = json.load(f)
-                if cached_data.get('folder_prefix') == folder_prefix:
-                    resources = cached_data.get('resources', [])
-                    cache_time = cached_data.get('timestamp', 'unknown')
-                    is_partial = cached_data.get('partial', False)
-                    print(f"✅ Using cached resources: {len(resources)} items")
-                    print(f"   Cached at: {cache_time}")
-                    if is_partial:
-                        print(f"   ⚠️  This is a partial cache (hit rate limit during fetch)")
-                    return resources
-        except Exception as e:
-            print(f"⚠️  Cache read error: {e}")
+            return fn()
+        except Error as e:
+            # The uploader raises a bare Error for socket/HTTP failures and
+            # unmapped statuses such as 502/504; its subclasses other than
+            # RateLimited/GeneralError (BadRequest, NotFound...) are permanent
+            transient = isinstance(e, (RateLimited, GeneralError)) or type(e) is Error
+            if not transient or attempt == max_retries or (stop is not None and stop.is_set()):
+                raise
+            
+            delay = min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.0)
+            log(f"  ⏳ {type(e).__name__}: retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                raise  # Another caller gave up on the same quota
+
+
+def get_listing_shards(folder_prefix):
+    """
+    Split a listing into independent shards that can be paged in parallel
+    The whole collection is split per manga (manga/<slug>/) plus a shard for
+    assets stored directly in manga/; a single manga is listed as one shard,
+    and so is the collection when sharding would cost more API calls
+    """
     
-    print(f"🔍 Fetching resources from source: {folder_prefix}")
-    print(f"⚠️  This uses Cloudinary API calls (limit: 500/hour)")
+    if folder_prefix != CLOUDINARY_BASE:
+        return [folder_prefix]
     
-    CloudinaryClient.configure_source()
+    # Sharding costs at least one call per manga, a single listing one call
+    # per 500 assets - estimated from the account's total asset count
+    try:
+        usage = with_backoff(lambda: cloudinary.api.usage(**SOURCE_CONFIG))
+        estimated_pages = math.ceil(usage.get('resources', 0) / 500)
+    except Exception as e:
+        print(f"⚠️  Could not read account usage ({e}), fetching as a single listing")
+        return [folder_prefix]
     
-    all_resources = []
+    shards = [f"{FOLDER_SHARD}{folder_prefix}"]
     next_cursor = None
+    
+    try:
+        while len(shards) < estimated_pages:
+            result = with_backoff(lambda: cloudinary.api.subfolders(
+                folder_prefix,
+                max_results=500,
+                next_cursor=next_cursor,
+                **SOURCE_CONFIG
+            ))
+            
+            # Trailing slash so manga/one/ doesn't also match manga/one-piece/
+            shards.extend(f"{folder['path']}/" for folder in result.get('folders', []))
+            
+            next_cursor = result.get('next_cursor')
+            if not next_cursor:
+                break
+    except Exception as e:
+        print(f"⚠️  Could not list manga folders ({e}), fetching as a single listing")
+        return [folder_prefix]
+    
+    if len(shards) == 1:
+        return [folder_prefix]
+    if len(shards) >= estimated_pages:
+        print(f"  🗂️  Too many manga folders for ~{estimated_pages} pages, fetching as a single listing")
+        return [folder_prefix]
+    
+    print(f"  🗂️  Listing {len(shards) - 1} manga folders with {LISTING_WORKERS} workers")
+    return shards
+
+
+def fetch_listing_page(shard, next_cursor):
+    """
+    Fetch one page of a listing shard
+    'folder:<path>' shards hold only the assets directly in <path> (Search API);
+    any other shard is a prefix listed with the Admin API
+    """
+    
+    if shard.startswith(FOLDER_SHARD):
+        search = (cloudinary.Search()
+                  .expression(f'folder="{shard[len(FOLDER_SHARD):]}" AND resource_type:image AND type:upload')
+                  .max_results(500))
+        if next_cursor:
+            search.next_cursor(next_cursor)
+        return search.execute(**SOURCE_CONFIG)
+    
+    return cloudinary.api.resources(
+        type='upload',
+        prefix=shard,
+        max_results=500,  # Max allowed per request
+        next_cursor=next_cursor,
+        **SOURCE_CONFIG
+    )
+
+
+def load_cache_meta():
+    """Load the resource cache listing state, or None if there is no usable cache"""
+    
+    if not (os.path.exists(RESOURCE_CACHE_META) and os.path.exists(RESOURCE_CACHE)):
+        return None
+    
+    try:
+        with open(RESOURCE_CACHE_META, 'rb') as f:
+            return orjson.loads(f.read())
+    except Exception as e:
+        print(f"⚠️  Cache read error: {e}")
+        return None
+
+
+def save_cache_meta(meta):
+    """Atomically rewrite the resource cache listing state"""
+    tmp_path = RESOURCE_CACHE_META + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(meta))
+    os.replace(tmp_path, RESOURCE_CACHE_META)
+
+
+def load_resource_cache():
+    """
+    Read cached resources, one per resource_key
+    Undecodable lines (a run killed mid-append) are skipped, and a page
+    appended again by a resumed listing is only kept once
+    Returns: (resources, corrupt_line_count)
+    """
+    
+    resources = {}
+    corrupt = 0
+    
+    with open(RESOURCE_CACHE, 'rb') as f:
+        for line in f:
+            try:
+                resource = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                corrupt += 1
+                continue
+            resources[resource_key(resource)] = resource
+    
+    if corrupt:
+        print(f"⚠️  Skipped {corrupt} corrupt lines in {RESOURCE_CACHE}")
+    
+    return list(resources.values()), corrupt
+
+
+def trim_resource_cache():
+    """
+    Cut a truncated last line (run killed mid-append) off RESOURCE_CACHE,
+    so a resumed listing appends on a fresh line
+    Its page was never recorded in meta['pending'], so it is fetched again
+    """
+    
+    with open(RESOURCE_CACHE, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        
+        # A cached resource is far shorter than 64KB
+        f.seek(max(0, size - 65536))
+        tail = f.read()
+        if not tail or tail.endswith(b'\n'):
+            return
+        
+        f.truncate(size - len(tail) + tail.rfind(b'\n') + 1)
+        print(f"   ✂️  Dropped a truncated last line from {RESOURCE_CACHE}")
+
+
+def new_listing_meta(folder_prefix):
+    """Listing state for a fresh listing of folder_prefix, every shard pending"""
+    return {
+        'folder_prefix': folder_prefix,
+        'timestamp': datetime.now().isoformat(),
+        'partial': True,
+        'pending': {shard: None for shard in get_listing_shards(folder_prefix)},
+        'fetch_count': 0
+    }
+
+
+def fetch_resources_for_prefix(prefix, next_cursor, cache_file, meta, stop):
+    """
+    Page through all resources of a single listing shard, starting at next_cursor
+    Each page is appended to the cache and its cursor saved in meta['pending']
+    Sets stop on a rate limit and returns early once stop is set, leaving
+    the shard in meta['pending'] for the next run
+    Returns: (resource_count, fetch_count, error) - error is None if complete
+    or stopped by another shard
+    """
+    
+    resource_count = 0
     fetch_count = 0
     
     try:
         while True:
+            # Another shard hit the hourly limit - nothing left can succeed
+            if stop.is_set():
+                break
+            
             fetch_count += 1
             
             # Fetch resources with pagination
-            result = cloudinary.api.resources(
-                type='upload',
-                prefix=folder_prefix,
-                max_results=500,  # Max allowed per request
-                next_cursor=next_cursor
-            )
+            result = with_backoff(lambda: fetch_listing_page(prefix, next_cursor), stop=stop)
             
-            resources = result.get('resources', [])
-            all_resources.extend(resources)
+            page = result.get('resources', [])
+            next_cursor = result.get('next_cursor')
             
-            print(f"  📦 Fetched {len(resources)} resources (total: {len(all_resources)}) [API call #{fetch_count}]")
+            # Append the page and record where to resume from
+            with _cache_lock:
+                cache_file.write(b''.join(orjson.dumps(r, option=orjson.OPT_APPEND_NEWLINE) for r in page))
+                cache_file.flush()
+                
+                if next_cursor:
+                    meta['pending'][prefix] = next_cursor
+                else:
+                    del meta['pending'][prefix]
+                meta['fetch_count'] += 1
+                save_cache_meta(meta)
+            
+            resource_count += len(page)
+            print(f"  📦 {prefix}: fetched {len(page)} resources (total: {resource_count}) [API call #{fetch_count}]")
             
-            next_cursor = result.get('next_cursor')
             if not next_cursor:
                 break
-            
-            # Small delay between requests
-            time.sleep(0.5)
     
     except Exception as e:
-        error_msg = str(e)
+        if isinstance(e, RateLimited):
+            stop.set()
+        return resource_count, fetch_count, e
+    
+    return resource_count, fetch_count, None
+
+
+def get_all_resources_from_source(folder_prefix):
+    """
+    Get all resources from source Cloudinary under a folder prefix
+    Returns list of resources with their metadata
+    USES CACHING to avoid re-fetching on rate limit errors - pages are
+    appended to RESOURCE_CACHE as they arrive, and a partial listing
+    resumes from its saved cursors on the next run
+    """
+    
+    # Check cache first
+    meta = load_cache_meta()
+    if meta and meta.get('folder_prefix') == folder_prefix:
+        print(f"📦 Found cached resource list: {RESOURCE_CACHE}")
+        print(f"   Cached at: {meta.get('timestamp', 'unknown')}")
+        
+        if meta.get('partial'):
+            print(f"   ⚠️  Partial cache - resuming listing of {len(meta['pending'])} prefixes")
+            trim_resource_cache()
+            cache_mode = 'ab'
+        else:
+            resources, corrupt = load_resource_cache()
+            if not corrupt:
+                print(f"✅ Using cached resources: {len(resources)} items")
+                return resources
+            
+            # A complete listing has no cursors to resume from - list again
+            print(f"   ⚠️  Corrupt cache - listing again")
+            meta = new_listing_meta(folder_prefix)
+            cache_mode = 'wb'
+    else:
+        print(f"🔍 Fetching resources from source: {folder_prefix}")
+        print(f"⚠️  This uses Cloudinary API calls (limit: 500/hour)")
+        
+        meta = new_listing_meta(folder_prefix)
+        cache_mode = 'wb'
+    
+    error = None
+    stop = threading.Event()  # Set once any shard is rate limited
+    
+    # List each pending shard in parallel, appending pages to the cache
+    with open(RESOURCE_CACHE, cache_mode) as cache_file:
+        save_cache_meta(meta)
+        
+        with ThreadPoolExecutor(max_workers=LISTING_WORKERS) as executor:
+            results = executor.map(
+                lambda shard: fetch_resources_for_prefix(shard[0], shard[1], cache_file, meta, stop),
+                list(meta['pending'].items())
+            )
+            for _, _, shard_error in results:
+                if shard_error is not None and error is None:
+                    error = shard_error
+    
+    meta['partial'] = bool(meta['pending'])
+    save_cache_meta(meta)
+    
+    all_resources, _ = load_resource_cache()
+    
+    if error is not None:
+        error_msg = str(error)
         
         # Check if rate limit error
-        if '420' in error_msg or 'rate limit' in error_msg.lower():
+        if isinstance(error, RateLimited) or '420' in error_msg or 'rate limit' in error_msg.lower():
             print(f"\n⚠️  RATE LIMIT HIT!")
-            print(f"   Fetched {len(all_resources)} resources before limit")
-            
-            if len(all_resources) > 0:
-                print(f"   💾 Caching what we have so far...")
-                # Save partial results to cache
-                cache_data = {
-                    'folder_prefix': folder_prefix,
-                    'resources': all_resources,
-                    'timestamp': datetime.now().isoformat(),
-                    'partial': True,
-                    'fetch_count': fetch_count
-                }
-                with open(RESOURCE_CACHE, 'w') as f:
-                    json.dump(cache_data, f, indent=2)
-                print(f"   ✅ Cached {len(all_resources)} resources")
-                print(f"   🔄 Will use this cache on next run and continue migration")
-                return all_resources
+            print(f"   💾 Cached {len(all_resources)} resources so far")
+            print(f"   🔄 Will use this cache on next run and continue listing from where it stopped")
+            return all_resources
         
         print(f"❌ Error fetching resources: {error_msg}")
-        return all_resources if all_resources else []
-    
-    # Save complete results to cache
-    if all_resources:
-        print(f"\n💾 Caching complete resource list...")
-        cache_data = {
-            'folder_prefix': folder_prefix,
-            'resources': all_resources,
-            'timestamp': datetime.now().isoformat(),
-            'partial': False,
-            'fetch_count': fetch_count
-        }
-        try:
-            with open(RESOURCE_CACHE, 'w') as f:
-                json.dump(cache_data, f, indent=2)
-            print(f"✅ Cached {len(all_resources)} resources")
-        except Exception as e:
-            print(f"⚠️  Could not save cache: {e}")
+        return all_resources
     
+    print(f"✅ Cached {len(all_resources)} resources")
     print(f"✅ Total resources found: {len(all_resources)}")
     return all_resources
 
@@ -226,53 +504,34 @@ def get_all_resources_from_source(folder_prefix):
 # IMAGE MIGRATION WITH PARALLEL PROCESSING
 # ============================================
 
-def migrate_image(resource, already_migrated, worker_id=0):
+def migrate_image(resource):
     """
     Migrate a single image from source to destination
     Returns: (success, error_message, public_id, file_size_kb)
     """
     
-    public_id = resource.get('public_id')
-    folder = resource.get('folder', '')
+    public_id = resource_key(resource)
     secure_url = resource.get('secure_url')
-    format_type = resource.get('format', 'jpg')
-    
-    # Check if already migrated
-    if public_id in already_migrated:
-        return True, "already_migrated", public_id, 0
+    file_size_kb = resource.get('bytes', 0) / 1024  # Size from the source listing
     
     try:
-        # Download from source
-        CloudinaryClient.configure_source()
-        
-        response = requests.get(secure_url, timeout=30)
-        response.raise_for_status()
-        image_data = response.content
-        file_size_kb = len(image_data) / 1024
-        
-        # Upload to destination
-        CloudinaryClient.configure_dest()
-        
-        # Ensure folder exists in destination
-        if folder:
-            try:
-                cloudinary.api.create_folder(folder)
-            except:
-                pass  # Folder might already exist
-        
-        # Upload with same public_id and folder structure
-        upload_result = cloudinary.uploader.upload(
-            image_data,
+        # Destination fetches the image straight from the source URL, so the
+        # bytes never pass through this machine
+        with_backoff(lambda: cloudinary.uploader.upload(
+            secure_url,
             public_id=public_id,
             overwrite=False,
             resource_type="auto",
             use_filename=False,
-            unique_filename=False
-        )
+            unique_filename=False,
+            **DEST_CONFIG
+        ), max_retries=3, log=progress_log.info)
         
+        log_migration(public_id, public_id, 'success', '')
         return True, "", public_id, file_size_kb
         
     except Exception as e:
+        log_migration(public_id, public_id, 'failed', str(e))
         return False, str(e), public_id, 0
 
 
@@ -280,6 +539,51 @@ def migrate_image(resource, already_migrated, worker_id=0):
 # MAIN MIGRATION LOGIC
 # ============================================
 
+def migration_worker(work_queue, result_queue):
+    """
+    Migrate resources from work_queue until a None sentinel arrives
+    Puts (resource, result) on result_queue - result is the exception
+    if migrate_image raised
+    """
+    
+    while True:
+        resource = work_queue.get()
+        if resource is None:
+            break
+        
+        try:
+            result = migrate_image(resource)
+        except Exception as e:
+            result = e
+        
+        result_queue.put((resource, result))
+
+
+def start_progress_logging():
+    """
+    Route progress_log through a queue drained by a background thread,
+    so the result loop never blocks on stdout
+    """
+    
+    progress_queue = queue.Queue(-1)
+    
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    listener = QueueListener(progress_queue, stdout_handler)
+    progress_log.addHandler(QueueHandler(progress_queue))
+    listener.start()
+    
+    return listener
+
+
+def stop_progress_logging(listener):
+    """Flush queued progress lines and detach the queue handler"""
+    listener.stop()
+    for handler in list(progress_log.handlers):
+        progress_log.removeHandler(handler)
+
+
 def migrate_manga_folder(manga_slug=None):
     """
     Migrate all manga images from source to destination
@@ -302,7 +606,8 @@ def migrate_manga_folder(manga_slug=None):
     print(f"📁 Folder prefix: {folder_prefix}\n")
     
     # Load migration log
-    already_migrated = load_migration_log()
+    # Read-only from here on, so workers can share it without locking
+    already_migrated = frozenset(load_migration_log())
     print(f"✅ Already migrated: {len(already_migrated)} images\n")
     
     # Get all resources from source (uses cache if available)
@@ -316,7 +621,12 @@ def migrate_manga_folder(manga_slug=None):
         }
     
     # Filter out already migrated
-    to_migrate = [r for r in resources if r.get('public_id') not in already_migrated]
+    to_migrate = [r for r in resources if resource_key(r) not in already_migrated]
+    
+    # Readable name for progress lines (slug/chapter/panel), computed once
+    # here rather than in the result loop
+    for r in to_migrate:
+        r['_display'] = '/'.join(resource_key(r).rsplit('/', 3)[-3:])
     
     print(f"\n📊 Migration Plan:")
     print(f"  Total images in source: {len(resources)}")
@@ -336,83 +646,118 @@ def migrate_manga_folder(manga_slug=None):
     # Migrate images with parallel processing
     success_count = 0
     failed_count = 0
-    skipped_count = 0
-    total_size_mb = 0
+    skipped_count = len(resources) - len(to_migrate)  # Filtered out by the migration log
+    total_size_kb = 0
     
     print(f"🚀 Starting PARALLEL migration with {PARALLEL_WORKERS} workers...\n")
     
     start_time = time.time()
     processed = 0
+    total = len(to_migrate)
+    progress = f"[{{}}/{total}]".format
+    
+    # Progress lines are queued and written to stdout by a background thread
+    progress_listener = start_progress_logging()
+    
+    # Persistent workers fed by a bounded queue - only O(workers) resources
+    # are in flight at once instead of a Future for every image
+    work_queue = queue.Queue(maxsize=PARALLEL_WORKERS * 4)
+    result_queue = queue.Queue()
+    workers = [
+        threading.Thread(
+            target=migration_worker,
+            args=(work_queue, result_queue),
+            name=f"migration-worker-{i}",
+            daemon=True
+        )
+        for i in range(PARALLEL_WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
     
-    # Use ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor(max_workers=PARALLEL_WORKERS) as executor:
-        # Submit all tasks
-        future_to_resource = {
-            executor.submit(migrate_image, resource, already_migrated, i % PARALLEL_WORKERS): resource 
-            for i, resource in enumerate(to_migrate)
-        }
-        
-        # Process completed tasks as they finish
-        for future in as_completed(future_to_resource):
-            processed += 1
-            resource = future_to_resource[future]
-            public_id = resource.get('public_id')
+    # Fill the queue once; afterwards each result pulls in the next resource,
+    # so the queue never holds more than maxsize items and put() never blocks
+    pending = iter(to_migrate)
+    for resource in itertools.islice(pending, work_queue.maxsize):
+        work_queue.put(resource)
+    
+    try:
+        # Process results as they finish
+        for _ in range(total):
+            resource, outcome = result_queue.get()
+            
+            # Keep the work queue topped up - one in for every one out
+            next_resource = next(pending, None)
+            if next_resource is not None:
+                work_queue.put(next_resource)
             
-            # Extract readable info
-            parts = public_id.split('/')
-            display_name = '/'.join(parts[-3:]) if len(parts) >= 3 else public_id
+            processed += 1
+            display_name = resource['_display']
             
             try:
-                success, error, public_id, file_size_kb = future.result()
-                total_size_mb += file_size_kb / 1024
+                if isinstance(outcome, Exception):
+                    raise outcome
                 
-                # Progress calculations
-                elapsed = time.time() - start_time
-                rate = processed / elapsed if elapsed > 0 else 0
-                eta_seconds = (len(to_migrate) - processed) / rate if rate > 0 else 0
-                eta_minutes = eta_seconds / 60
+                success, error, public_id, file_size_kb = outcome
+                total_size_kb += file_size_kb
+                report = processed % PROGRESS_EVERY == 0
                 
                 if success:
-                    if error == "already_migrated":
-                        print(f"⏭️  [{processed}/{len(to_migrate)}] SKIP: {display_name}")
-                        skipped_count += 1
-                        log_migration(public_id, public_id, 'skipped', 'already_migrated')
-                    else:
-                        print(f"✅ [{processed}/{len(to_migrate)}] OK: {display_name} ({file_size_kb:.1f}KB)")
-                        success_count += 1
-                        log_migration(public_id, public_id, 'success', '')
-                        already_migrated.add(public_id)
+                    success_count += 1
+                    if report:
+                        progress_log.info(f"✅ {progress(processed)} OK: {display_name} ({file_size_kb:.1f}KB)")
                 else:
-                    print(f"❌ [{processed}/{len(to_migrate)}] FAIL: {display_name}")
-                    print(f"   └─ Error: {error[:80]}")
+                    progress_log.info(f"❌ {progress(processed)} FAIL: {display_name}")
+                    progress_log.info(f"   └─ Error: {error[:80]}")
                     failed_count += 1
-                    log_migration(public_id, public_id, 'failed', error)
                 
                 # Checkpoint every 50 images
                 if processed % 50 == 0:
-                    print(f"\n{'═'*80}")
-                    print(f"🎯 CHECKPOINT: {processed}/{len(to_migrate)} ({(processed/len(to_migrate)*100):.1f}%)")
-                    print(f"   ✅ Success: {success_count} | ❌ Failed: {failed_count} | ⏭️  Skipped: {skipped_count}")
-                    print(f"   ⏱️  Elapsed: {elapsed/60:.1f}m | Rate: {rate*60:.1f}/min | ETA: {eta_minutes:.1f}m")
-                    print(f"   💾 Data migrated: {total_size_mb:.1f}MB")
-                    if processed > skipped_count:
-                        success_rate = (success_count/(processed-skipped_count)*100)
-                        print(f"   📈 Success rate: {success_rate:.1f}%")
-                    print(f"{'═'*80}\n")
+                    elapsed = time.time() - start_time
+                    rate = processed / elapsed if elapsed > 0 else 0
+                    eta_minutes = (total - processed) / rate / 60 if rate > 0 else 0
+                    
+                    progress_log.info(f"\n{'═'*80}")
+                    progress_log.info(f"🎯 CHECKPOINT: {processed}/{total} ({(processed/total*100):.1f}%)")
+                    progress_log.info(f"   ✅ Success: {success_count} | ❌ Failed: {failed_count} | ⏭️  Skipped: {skipped_count}")
+                    progress_log.info(f"   ⏱️  Elapsed: {elapsed/60:.1f}m | Rate: {rate*60:.1f}/min | ETA: {eta_minutes:.1f}m")
+                    progress_log.info(f"   💾 Data migrated: {total_size_kb/1024:.1f}MB")
+                    success_rate = (success_count/processed*100)
+                    progress_log.info(f"   📈 Success rate: {success_rate:.1f}%")
+                    progress_log.info(f"{'═'*80}\n")
             
             except Exception as e:
-                print(f"❌ [{processed}/{len(to_migrate)}] ERROR: {display_name}")
-                print(f"   └─ Exception: {str(e)[:80]}")
+                progress_log.info(f"❌ {progress(processed)} ERROR: {display_name}")
+                progress_log.info(f"   └─ Exception: {str(e)[:80]}")
                 failed_count += 1
+                public_id = resource_key(resource)
                 log_migration(public_id, public_id, 'failed', str(e))
+    finally:
+        # Drop queued work (only non-empty if interrupted), stop the workers
+        # once their current image is done
+        while True:
+            try:
+                work_queue.get_nowait()
+            except queue.Empty:
+                break
+        for worker in workers:
+            work_queue.put(None)
+        for worker in workers:
+            worker.join()
+        
+        # Workers are done - drain pending progress lines and fold their
+        # log shards into MIGRATION_LOG
+        stop_progress_logging(progress_listener)
+        merge_log_shards()
     
     # Final summary
     total_time = time.time() - start_time
+    total_size_mb = total_size_kb / 1024
     print("\n" + "="*80)
     print("  📊 MIGRATION SUMMARY")
     print("="*80)
     print(f"⏱️  Total time: {total_time/60:.1f} minutes ({total_time/3600:.2f} hours)")
-    print(f"📦 Total processed: {len(to_migrate)}")
+    print(f"📦 Total processed: {total}")
     print(f"✅ Successfully migrated: {success_count}")
     print(f"⏭️  Skipped (already migrated): {skipped_count}")
     print(f"❌ Failed: {failed_count}")